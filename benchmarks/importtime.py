@@ -0,0 +1,68 @@
+"""
+Check cold import cost of pankoff with ``python -X importtime``.
+
+Fails if importing pankoff takes longer than the budget, or if it pulls stdlib modules which are supposed
+to be imported lazily (only when the feature which needs them is used).
+
+    $ python benchmarks/importtime.py --budget-ms 20
+"""
+import argparse
+import compileall
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATEMENT = "import pankoff.base, pankoff.validators, pankoff.magic"
+LAZY_MODULES = ("copy", "csv", "dis", "inspect", "json", "queue", "re", "textwrap", "threading", "weakref", "yaml")
+
+
+def _imports(statement):
+    """
+    Run ``statement`` in a fresh interpreter and return ``[(module, cumulative_us, is_top_level)]``.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env, stderr=subprocess.PIPE, universal_newlines=True, check=True
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((name.strip(), int(cumulative), not name[1:].startswith(" ")))
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=20.0, help="max cumulative import time of pankoff")
+    parser.add_argument("--runs", type=int, default=5, help="number of runs, the fastest one is taken")
+    args = parser.parse_args()
+
+    compileall.compile_dir(os.path.join(ROOT, "pankoff"), quiet=1)  # measure import, not compilation
+    baseline = {name for name, _, _ in _imports("pass")}
+    timings = []
+    for _ in range(args.runs):
+        imports = _imports(STATEMENT)
+        timings.append(sum(
+            cumulative for name, cumulative, top_level in imports
+            if top_level and name.split(".")[0] == "pankoff"
+        ))
+    elapsed_ms = min(timings) / 1000
+    eager = sorted({name for name, _, _ in imports if name in LAZY_MODULES} - baseline)
+
+    print(f"import pankoff: {elapsed_ms:.2f}ms (budget {args.budget_ms}ms)")
+    failed = False
+    if elapsed_ms > args.budget_ms:
+        print("FAIL: import takes longer than the budget")
+        failed = True
+    if eager:
+        print(f"FAIL: modules which should be imported lazily are imported eagerly: {', '.join(eager)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
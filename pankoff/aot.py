@@ -0,0 +1,406 @@
+import builtins
+import hashlib
+import math
+import os
+import sys
+
+from pankoff.base import UNSET, BaseValidator, Container, _defines, collect_fields, compile_getter
+from pankoff.magic import Alias, _frozen_setattr
+from pankoff.validators import Dict, Number, Pattern, Sized, Type
+
+GENERATOR_VERSION = 1
+
+module_template = '''\
+# Generated by pankoff.aot from {model_path}, do not edit.
+# Regenerate it with pankoff.aot.compile_model once the model is changed.
+import json
+{imports}
+from pankoff.aot import fingerprint
+from pankoff.base import INVALID, UNSET, collect_fields, compile_getter, compile_validator
+from pankoff.exceptions import ValidationError
+from pankoff.magic import _initializing
+import {model_module} as _module
+
+FINGERPRINT = {fingerprint!r}
+
+_model = _module.{model_name}
+if fingerprint(_model) != FINGERPRINT:
+    raise ImportError(f"{{__name__}} is out of date, regenerate it from {model_path}")
+
+_fields = collect_fields(_model)
+{constants}
+
+
+def _matches(match, value):
+    try:
+        return match(value) is not None
+    except TypeError:
+        return False
+
+
+def construct({arguments}):
+    instance = object.__new__(_model)
+    fields = instance.__dict__
+    errors = []
+{construct_body}    if errors:
+        raise ValidationError(errors)
+{user_init}    return instance
+
+
+def validate(data):
+    return construct(**data)
+
+
+def asdict(instance, dump_aliases=False):
+    fields = instance.__dict__
+    if dump_aliases:
+        return {{{aliased_items}}}
+    return {{{items}}}
+
+
+def asjson(instance, dump_aliases=False, **kwargs):
+    return json.dumps(asdict(instance, dump_aliases), **kwargs)
+'''
+
+
+def _is_literal(value):
+    if type(value) in (tuple, frozenset):
+        return all(_is_literal(item) for item in value)
+    if type(value) is float:
+        return math.isfinite(value)
+    return type(value) in (bool, int, str, bytes, type(None))
+
+
+def _describe_code(code):
+    consts = ",".join(
+        _describe_code(const) if hasattr(const, "co_code") else _describe(const, set())
+        for const in code.co_consts
+    )
+    return f"{code.co_code.hex()}|{consts}|{','.join(code.co_names)}"
+
+
+def _describe(value, seen):
+    # containers go first: ``repr`` of sets depends on ``PYTHONHASHSEED``, description shouldn't
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}({','.join(_describe(item, seen) for item in value)})"
+    if isinstance(value, (set, frozenset)):
+        return f"{type(value).__name__}({','.join(sorted(_describe(item, seen) for item in value))})"
+    if _is_literal(value):
+        return repr(value)
+    if isinstance(value, dict):
+        return "{" + ",".join(sorted(f"{_describe(k, seen)}:{_describe(v, seen)}" for k, v in value.items())) + "}"
+    if isinstance(value, type) and issubclass(value, Container):
+        if value in seen:
+            return value.__qualname__
+        seen.add(value)
+        return fingerprint(value, _seen=seen)
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    if hasattr(value, "pattern") and hasattr(value, "flags"):
+        return f"re({value.pattern!r},{value.flags})"
+    while hasattr(value, "__wrapped__"):
+        value = value.__wrapped__
+    if hasattr(value, "__code__"):
+        return f"{value.__qualname__}:{_describe_code(value.__code__)}"
+    if isinstance(value, BaseValidator):
+        parts = []
+        for base in type(value).mro():
+            parts.append(base.__qualname__)
+            for func_name in ("__setup__", "validate", "validate_many", "mutate"):
+                if func_name in vars(base):
+                    parts.append(_describe(vars(base)[func_name], seen))
+        for name, attr in sorted(vars(value).items()):
+            if name != "field_name" and not name.startswith("_"):
+                parts.append(f"{name}={_describe(attr, seen)}")
+        return "|".join(parts)
+    return type(value).__qualname__
+
+
+def fingerprint(model, _seen=None):
+    """
+    Hash of everything generated code for ``model`` depends on: fields, their validators
+    and settings, code of validators, aliases, merged ``__init__``.
+
+    :param model: class decorated with ``autoinit``
+    :return: hex string
+    """
+    seen = {model} if _seen is None else _seen
+    parts = [str(GENERATOR_VERSION), model.__module__, model.__qualname__]
+    for name, field in collect_fields(model).items():
+        parts.append(f"{name}:{_describe(field, seen)}")
+    for name, attr in collect_fields(model, (Alias,)).items():
+        parts.append(f"{name}->{attr.source}")
+    parts.append(_describe(getattr(model.__init__, "__merged_init__", None), seen))
+    parts.append(str(model.__setattr__ is _frozen_setattr))
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+class _Builder:
+
+    def __init__(self):
+        self.imports = set()
+        self.constants = []
+
+    def constant(self, value, fallback):
+        """
+        Source for ``value``: literal if possible, module level name bound to ``fallback`` expression otherwise.
+        """
+        if _is_literal(value):
+            return repr(value)
+        if isinstance(value, type):
+            fallback = self.type_path(value) or fallback
+        return self.bind(fallback)
+
+    def bind(self, expression):
+        name = f"_c{len(self.constants)}"
+        self.constants.append(f"{name} = {expression}")
+        return name
+
+    def type_path(self, kind):
+        if getattr(builtins, kind.__name__, None) is kind:
+            return kind.__name__
+        target = sys.modules.get(kind.__module__)
+        for part in kind.__qualname__.split("."):
+            target = getattr(target, part, None)
+        if target is not kind:
+            return None
+        self.imports.add(kind.__module__)
+        return f"{kind.__module__}.{kind.__qualname__}"
+
+
+def _type_steps(builder, validator, source, value):
+    checks = " or ".join(
+        f"not isinstance({value}, {builder.constant(type_, f'{source}.types[{index}]')})"
+        for index, type_ in enumerate(validator.types)
+    )
+    types_names = ", ".join(type_.__name__ for type_ in validator.types)
+    return [(checks, repr(f"Attribute `{validator.field_name}` should be an instance of `{types_names}`"))]
+
+
+def _number_steps(builder, validator, source, value):
+    steps = _type_steps(builder, validator, source, value)
+    name = validator.field_name
+    if validator.min_value is not None:
+        minimum = builder.constant(validator.min_value, f"{source}.min_value")
+        steps.append((f"{value} < {minimum}", repr(f"Attribute `{name}` should be >= {validator.min_value}")))
+    if validator.max_value is not None:
+        maximum = builder.constant(validator.max_value, f"{source}.max_value")
+        steps.append((f"{value} > {maximum}", repr(f"Attribute `{name}` should be <= {validator.max_value}")))
+    return steps
+
+
+def _sized_steps(builder, validator, source, value):
+    steps = []
+    name = validator.field_name
+    if validator.min_size is not None:
+        minimum = builder.constant(validator.min_size, f"{source}.min_size")
+        message = f"Attribute `{name}` length should be >= {validator.min_size}"
+        steps.append((f"len({value}) < {minimum}", repr(message)))
+    if validator.max_size is not None:
+        maximum = builder.constant(validator.max_size, f"{source}.max_size")
+        message = f"Attribute `{name}` length should be <= {validator.max_size}"
+        steps.append((f"len({value}) > {maximum}", repr(message)))
+    return steps
+
+
+def _dict_steps(builder, validator, source, value):
+    steps = _type_steps(builder, validator, source, value)
+    if validator.required_keys is not UNSET:
+        required = builder.constant(validator.required_keys, f"{source}.required_keys")
+        steps.append((
+            f"not {required} <= {value}.keys()",
+            repr(f"Missing required keys for value in `{validator.field_name}` field")
+        ))
+    return steps
+
+
+def _pattern_steps(builder, validator, source, value):
+    pattern = validator.pattern
+    builder.imports.add("re")
+    match = builder.bind(f"re.compile({pattern.pattern!r}, {pattern.flags}).{validator.mode}")
+    error_message = validator.error_message or "Attribute `{field_name}` should match `{pattern}`"
+    if "{value}" in error_message:
+        message = builder.bind(repr(error_message))
+        message = f"{message}.format(field_name={validator.field_name!r}, pattern={pattern.pattern!r}, value={value})"
+    else:
+        message = repr(error_message.format(field_name=validator.field_name, pattern=pattern.pattern))
+    return [(f"not _matches({match}, {value})", message)]
+
+
+# validator which defines ``validate`` -> (steps emitter, validators it covers)
+_EMITTERS = {
+    Type: (_type_steps, (Type,)),
+    Number: (_number_steps, (Number, Type)),
+    Dict: (_dict_steps, (Dict, Type)),
+    Sized: (_sized_steps, (Sized,)),
+    Pattern: (_pattern_steps, (Pattern,)),
+}
+
+
+def _inline_steps(builder, validator, source, value):
+    """
+    List of ``(failure condition, message)`` expressions to inline for ``validator``, ``None`` if it can't be inlined.
+    """
+    steps = []
+    covered = set()
+    for base in type(validator).mro():
+        if not _defines(base, "validate") or base in covered:
+            continue
+        if base not in _EMITTERS:
+            return None
+        emit, covers = _EMITTERS[base]
+        steps.extend(emit(builder, validator, source, value))
+        covered.update(covers)
+    return steps
+
+
+def generate(model):
+    """
+    Generate source of standalone module for ``model``.
+
+    Module has ``construct(...)`` with the same arguments as generated ``__init__``, ``validate(data)``,
+    ``asdict(instance, dump_aliases=False)`` and ``asjson(instance, dump_aliases=False, **kwargs)``.
+    Checks of ``Type``, ``String``, ``Number``, ``Sized``, ``Dict``, ``Pattern`` and their combinations
+    are inlined, other validators (e.g ``Predicate``, ``LazyLoad``) are called through their resolved chain.
+    Field checks stop at first error of the field.
+
+    :param model: class decorated with ``autoinit``, defined at module level
+    :return: source code
+    """
+    from pankoff.validators import LazyLoad
+
+    if not hasattr(model.__init__, "__merged_init__"):
+        raise ValueError(f"{model} should be decorated with `autoinit`")
+    if "<locals>" in model.__qualname__:
+        raise ValueError(f"{model} should be defined at module level, generated module imports it by name")
+    builder = _Builder()
+    arguments = []
+    body = []
+    getters = {}
+    for name, field in collect_fields(model).items():
+        source = builder.bind(f"_fields[{name!r}]")
+        value = "UNSET" if isinstance(field, LazyLoad) else name
+        if not isinstance(field, LazyLoad):
+            if field.default_factory is not UNSET:
+                factory = builder.bind(f"{source}.default_factory")
+                arguments.append(f"{name}=UNSET")
+                body.append(f"if {name} is UNSET:\n        {name} = {factory}()")
+            elif field.default_value is not UNSET:
+                arguments.append(f"{name}={builder.constant(field.default_value, f'{source}.default_value')}")
+            else:
+                arguments.append(name)
+        steps = None if isinstance(field, LazyLoad) else _inline_steps(builder, field, source, value)
+        if steps is None:
+            check = builder.bind(f"compile_validator({source})")
+            body.append(
+                f"value = {check}(instance, {value}, errors)\n"
+                f"    if value is not INVALID:\n"
+                f"        fields[{field.field_name!r}] = value"
+            )
+        elif not steps:
+            body.append(f"fields[{field.field_name!r}] = {value}")
+        else:
+            branches = [
+                f"{'if' if index == 0 else 'elif'} {condition}:\n        errors.append({message})"
+                for index, (condition, message) in enumerate(steps)
+            ]
+            branches.append(f"else:\n        fields[{field.field_name!r}] = {value}")
+            body.append("\n    ".join(branches))
+        getter = compile_getter(field)
+        stored = f"fields[{field.field_name!r}]"
+        getters[name] = stored if getter is None else f"{builder.bind(f'compile_getter({source})')}(instance, {stored})"
+    arguments.sort(key=lambda item: "=" in item)  # move default parameters to the end
+
+    user_init = ""
+    merged_init = model.__init__.__merged_init__
+    if merged_init is not None:
+        arguments.extend(("*args", "**kwargs"))
+        call = f"{builder.bind('_model.__init__.__merged_init__')}(instance, *args, **kwargs)"
+        user_init = f"    {call}\n"
+        if model.__setattr__ is _frozen_setattr:
+            user_init = (
+                f"    _initializing.add(id(instance))\n    try:\n        {call}\n"
+                f"    finally:\n        _initializing.discard(id(instance))\n"
+            )
+
+    items = []
+    aliased_items = []
+    for name, attr in collect_fields(model, (BaseValidator, Alias)).items():
+        if isinstance(attr, BaseValidator):
+            items.append(f"{name!r}: {getters[name]}")
+            aliased_items.append(items[-1])
+        elif isinstance(attr, Alias):
+            target = getters.get(attr.source, f"getattr(instance, {attr.source!r})")
+            aliased_items.append(f"{name!r}: {target}")
+
+    return module_template.format(
+        model_path=f"{model.__module__}.{model.__qualname__}",
+        imports="".join(f"import {module}\n" for module in sorted(builder.imports)),
+        model_module=model.__module__,
+        model_name=model.__qualname__,
+        fingerprint=fingerprint(model),
+        constants="\n".join(builder.constants),
+        arguments=", ".join(arguments),
+        construct_body="".join(f"    {line}\n" for line in body),
+        user_init=user_init,
+        items=", ".join(items),
+        aliased_items=", ".join(aliased_items),
+    )
+
+
+def _read_fingerprint(path):
+    try:
+        with open(path) as fp:
+            for line in fp:
+                if line.startswith("FINGERPRINT = "):
+                    return line[len("FINGERPRINT = "):].strip().strip("'\"")
+    except OSError:
+        pass
+    return None
+
+
+def compile_model(model, path):
+    """
+    Write module generated for ``model`` to ``path``.
+
+    :param model: class decorated with ``autoinit``
+    :param path: path of ``.py`` file to write
+    """
+    import threading
+
+    source = generate(model)
+    compile(source, path, "exec")
+    # written next to ``path`` and moved over it, so concurrent ``load`` never imports half-written module
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "w") as fp:
+            fp.write(source)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def load(model, path):
+    """
+    Import module generated for ``model`` from ``path``, it's (re)generated first if missing or out of date.
+    Bytecode is cached in ``__pycache__`` as for any other module.
+
+    >>> person_module = load(Person, "compiled/person.py")
+    >>> person = person_module.construct(name="Guido", age=65)
+    >>> person_module.asjson(person)
+
+    :param model: class decorated with ``autoinit``
+    :param path: path of ``.py`` file
+    :return: module
+    """
+    import importlib.util
+
+    if _read_fingerprint(path) != fingerprint(model):
+        compile_model(model, path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -1,6 +1,5 @@
+import contextvars
 import functools
-import inspect
-import json
 from abc import ABCMeta, abstractmethod
 from types import MappingProxyType
 
@@ -10,6 +9,55 @@ from pankoff.exceptions import ValidationError
 # CAUTION!!! do not touch anything here
 
 UNSET = object()
+INVALID = object()
+
+COLLECT_ALL = "collect_all"
+FAIL_FAST = "fail_fast"
+COST_ORDERED = "cost_ordered"
+TRUSTED = "trusted"
+
+_validation_mode = contextvars.ContextVar("validation_mode", default=None)
+
+
+class _ValidationModeContext:
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.token = None
+
+    def __enter__(self):
+        self.token = _validation_mode.set(self.mode)
+
+    def __exit__(self, *exc_info):
+        _validation_mode.reset(self.token)
+
+
+def validation_mode(mode):
+    """
+    Set validation mode for everything validated within the block, overrides ``__validation_mode__`` of classes.
+
+    - ``COLLECT_ALL`` runs every validator and raises all errors at once
+    - ``FAIL_FAST`` raises on first error
+    - ``COST_ORDERED`` same as ``FAIL_FAST``, but validators of each field run from the cheapest one,
+      according to their ``cost``. Don't use it if field relies on validators order, e.g normalizing ``Predicate``
+    - ``TRUSTED`` skips validation, values are stored as is. ``mutate`` still applies on access,
+      ``computed`` validators (e.g ``LazyLoad``, ``ListOf`` of models) still run. Use it only for data you trust
+
+    >>> with validation_mode(FAIL_FAST):
+    ...     Person(...)
+
+    :param mode: one of ``COLLECT_ALL``, ``FAIL_FAST``, ``COST_ORDERED`` or ``TRUSTED``
+    """
+    if mode not in (COLLECT_ALL, FAIL_FAST, COST_ORDERED, TRUSTED):
+        raise ValueError(f"Unknown validation mode: {mode!r}")
+    return _ValidationModeContext(mode)
+
+
+def get_validation_mode(cls):
+    """
+    Get validation mode currently in effect for ``cls``.
+    """
+    return _validation_mode.get() or getattr(cls, "__validation_mode__", COLLECT_ALL)
 
 
 def is_combinator(obj):
@@ -17,16 +65,18 @@ def is_combinator(obj):
 
 
 class Container:
+    """
+    Set ``__validation_mode__`` to change how instances are validated by default,
+    see :func:`pankoff.base.validation_mode`.
+    """
+
+    __validation_mode__ = COLLECT_ALL
 
     def __repr__(self):
         """
         Make human readable representation of current instance.
         """
-        field_names = ", ".join(
-            f"{field.field_name}={getattr(self, field.field_name)}"
-            for field in vars(type(self)).values()
-            if isinstance(field, BaseValidator)
-        )
+        field_names = ", ".join(f"{name}={getattr(self, name)}" for name in collect_fields(type(self)))
         return f"{type(self).__name__}({field_names})"
 
     def __iter__(self):
@@ -54,10 +104,10 @@ class Container:
         :param kwargs: arguments to set on instancee before ``__init__`` call
         """
 
-        class _ExtraMeta(type):
+        class _ExtraMeta(type(cls)):
             def __call__(cls, *args, **kw):
                 instance = cls.__new__(cls, *args, **kw)
-                instance._extra = MappingProxyType(kwargs)
+                vars(instance)["_extra"] = MappingProxyType(kwargs)
                 instance.__init__(*args, **kw)
                 return instance
 
@@ -72,49 +122,68 @@ class Container:
             raise
 
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, mode=None, sampling=None):
         """
         Make on object from dictionary.
 
         :param data: dictionary to load
         :type data: dict
+
+        :param mode: validation mode, defaults to ``__validation_mode__`` of the class
+        :param sampling: validate only some of the records, the rest are loaded in ``TRUSTED`` mode,
+         see :class:`pankoff.bulk.Sampling`
         """
-        return cls(**data)
+        if sampling is not None:
+            return sampling.construct(cls, data, mode=mode)
+        if mode is None:
+            return cls(**data)
+        with validation_mode(mode):
+            return cls(**data)
 
     @classmethod
-    def from_json(cls, data, loader=json.loads):
+    def from_json(cls, data, loader=None):
         """
         Loads JSON and returns validated instance of it.
+
+        :param loader: defaults to ``json.loads``
         """
+        if loader is None:
+            import json
+            loader = json.loads
         return cls.from_dict(loader(data))
 
     @classmethod
-    def is_valid(cls, data):
+    def is_valid(cls, data, mode=FAIL_FAST):
         """
         Validate data
         :param data: data to validate
         :type data: dict
 
+        :param mode: validation mode, defaults to ``FAIL_FAST`` since errors are not reported anyway
+
         :return: ``True/False``
         """
         try:
-            cls.validate(data)
+            cls.validate(data, mode=mode)
             return True
         except ValidationError:
             return False
 
     @classmethod
-    def from_file(cls, fp, loader=json.load):
+    def from_file(cls, fp, loader=None):
         """
         Loads content from file using ``loader`` and returns validated instance of it.
 
         :param fp: file object
         :param loader: defaults to ``json.load``
         """
+        if loader is None:
+            import json
+            loader = json.load
         return cls.from_dict(loader(fp))
 
     @classmethod
-    def from_path(cls, path, loader=json.load):
+    def from_path(cls, path, loader=None):
         """
         Reads file at given path and returns validates instance of it.
         Uses ``loader`` to load it.
@@ -126,16 +195,84 @@ class Container:
             return cls.from_file(fp, loader=loader)
 
     @classmethod
-    def validate(cls, data):
+    def from_csv(cls, source, converters=None, on_error=None, mode=None, buffer_size=1 << 20, encoding=None,
+                 sampling=None, sink=None, error_budget=None, **fmtparams):
+        """
+        Stream CSV rows as validated instances, one at a time.
+
+        Header is mapped to fields once, column strings are converted to what field validators expect,
+        e.g ``Number`` columns are parsed as ``int``/``float``. Empty cells of fields with defaults are omitted.
+        Header with unknown columns or without required ones raises ``ValidationError`` straight away,
+        columns of ``LazyLoad`` fields are ignored.
+
+        >>> for person in Person.from_csv("people.tsv", delimiter="\\t", on_error=print):
+        ...     ...
+
+        :param source: path to a file, or file object opened with ``newline=""``
+        :param converters: ``{column: callable}`` to use instead of default converters
+        :type converters: dict, optional
+
+        :param on_error: callable to report invalid rows to, called with line number, raw row as dict and
+         ``ValidationError``. If neither ``on_error`` nor ``sink`` is set, first invalid row raises
+        :param mode: validation mode, defaults to ``__validation_mode__`` of the class
+        :param buffer_size: read buffer size in bytes, defaults to 1MiB
+        :param encoding: file encoding, used only if ``source`` is a path
+        :param sampling: validate only some of the rows, see :class:`pankoff.bulk.Sampling`
+        :param sink: where to put invalid rows, see ``from_records``
+        :param error_budget: see ``from_records``
+        :param fmtparams: propagated to ``csv.reader``, e.g ``delimiter="\\t"`` for TSV
+        """
+        from pankoff.bulk import read_csv
+
+        options = dict(
+            converters=converters, on_error=on_error, mode=mode, sampling=sampling, sink=sink,
+            error_budget=error_budget, **fmtparams
+        )
+        if hasattr(source, "read"):
+            yield from read_csv(cls, source, **options)
+        else:
+            with open(source, newline="", buffering=buffer_size, encoding=encoding) as fp:
+                yield from read_csv(cls, fp, **options)
+
+    @classmethod
+    def from_records(cls, records, on_error=None, mode=None, sampling=None, sink=None, error_budget=None):
+        """
+        Validate dictionaries one by one and yield instances made of them.
+
+        >>> people = Person.from_records(records, sink="rejected.jsonl", error_budget=0.05)
+
+        :param records: iterable of dictionaries. Records which aren't mappings, miss required fields
+         or have unknown ones are rejected as invalid
+        :param on_error: callable to report invalid records to, called with record index, record and
+         ``ValidationError``. If neither ``on_error`` nor ``sink`` is set, first invalid record raises
+        :param mode: validation mode, defaults to ``__validation_mode__`` of the class
+        :param sampling: validate only some of the records, see :class:`pankoff.bulk.Sampling`
+        :param sink: where to put invalid records along with their position and errors. Either path of
+         JSON Lines file, callable which accepts a batch of ``(position, record, errors)`` tuples,
+         or :class:`pankoff.bulk.Quarantine`. Writing happens in a background thread
+        :param error_budget: max number of invalid records, or their max ratio if ``float``,
+         see :class:`pankoff.bulk.ErrorBudget`. Once exceeded, ``ErrorBudgetExceeded`` is raised
+        """
+        from pankoff.bulk import load_records, record_items
+
+        yield from load_records(
+            cls, record_items(cls, records),
+            on_error=on_error, mode=mode, sampling=sampling, sink=sink, error_budget=error_budget
+        )
+
+    @classmethod
+    def validate(cls, data, mode=None):
         """
         Validate data and raise if its invalid.
 
         :param data: data to validate
         :type data: dict
 
+        :param mode: validation mode, defaults to ``__validation_mode__`` of the class
+
         :raises: ValidationError
         """
-        return cls.from_dict(data)
+        return cls.from_dict(data, mode=mode)
 
     def asdict(self, dump_aliases=False):
         """
@@ -149,16 +286,11 @@ class Container:
 
         >>> Person(...).asdict(dump_aliases=True)
         """
-        ret = {}
-        obj_type = type(self)
-        bases = (BaseValidator,)
+        kinds = (BaseValidator,)
         if dump_aliases:
             from pankoff.magic import Alias
-            bases += (Alias,)
-        for name, field in vars(obj_type).items():
-            if isinstance(field, bases):
-                ret[name] = getattr(self, name)
-        return ret
+            kinds += (Alias,)
+        return {name: getattr(self, name) for name in collect_fields(type(self), kinds)}
 
     def dumps(self, dumps, dump_aliases=False, **kwargs):
         """
@@ -182,6 +314,7 @@ class Container:
 
         >>> Person(...).asjson(dump_aliases=True, indent=4)
         """
+        import json
         return self.dumps(dump_aliases=dump_aliases, dumps=json.dumps, **kwargs)
 
     def asyaml(self, dump_aliases=False, **kwargs):
@@ -202,7 +335,7 @@ class Container:
             ) from exc
         return self.dumps(dump_aliases=dump_aliases, dumps=yaml.dump, **kwargs)
 
-    def to_path(self, path, dump_aliases=False, dumps=json.dumps, **kwargs):
+    def to_path(self, path, dump_aliases=False, dumps=None, **kwargs):
         """
         Dump current instance to a file.
         :param path: path to dump to
@@ -214,17 +347,34 @@ class Container:
 
         >>> Person(...).to_path("path/to/data.json", dump_aliases=True, indent=4)
         """
+        if dumps is None:
+            import json
+            dumps = json.dumps
         with open(path, "w") as fp:
             fp.write(self.dumps(dump_aliases=dump_aliases, dumps=dumps, **kwargs))
 
 
-def _invalidate_call_cache(instance, target):
-    instance_type = type(instance)
-    for base in instance_type.mro():
-        if hasattr(base, target):
-            attribute = getattr(base, target, None)
-            if hasattr(attribute, "__called__"):
-                del attribute.__called__
+def _add_errors(errors, exc):
+    messages = exc.errors if isinstance(exc.errors, list) else [str(exc)]
+    for message in messages:
+        if message not in errors:
+            errors.append(message)
+
+
+@functools.lru_cache(maxsize=None)
+def _parameter_names(func):
+    """
+    Names of ``func`` parameters, same as ``inspect.signature`` gives, but without importing ``inspect``.
+    """
+    while hasattr(func, "__wrapped__"):
+        func = func.__wrapped__
+    code = getattr(func, "__code__", None)
+    if code is None:
+        import inspect
+        return tuple(inspect.signature(func).parameters)
+    count = code.co_argcount + code.co_kwonlyargcount
+    count += bool(code.co_flags & 0x04) + bool(code.co_flags & 0x08)  # *args, **kwargs
+    return code.co_varnames[:count]
 
 
 class ExtendedABCMeta(ABCMeta):
@@ -244,100 +394,47 @@ class ExtendedABCMeta(ABCMeta):
 
 class _Descriptor:
 
-    def __init__(self, **kwargs):
-        _invalidate_call_cache(self, target="__setup__")
+    def __init__(self, default_value=UNSET, default_factory=UNSET, **kwargs):
+        if default_value is not UNSET and default_factory is not UNSET:
+            raise ValueError("`default_value` and `default_factory` are mutually exclusive")
+        self.default_value = default_value
+        self.default_factory = default_factory
 
     def __set_name__(self, owner, name):
         self.field_name = name
 
-    def __set__(self, instance, value, errors, **kwargs):
-        _invalidate_call_cache(self, target="validate")
-        if errors:
-            raise ValidationError(errors)
-        vars(instance)[self.field_name] = value
 
-    def __get__(self, instance, owner, __mro__, value):
-        _invalidate_call_cache(self, target="mutate")
-        return value
+class BaseValidator(_Descriptor, metaclass=ExtendedABCMeta):
+    cost = 1
+    computed = False
 
+    def __init__(self, **kwargs):
+        for _, setup in _resolve_chain(type(self), "__setup__"):
+            setup(self, **{name: kwargs.pop(name) for name in _parameter_names(setup) if name in kwargs})
+        super().__init__(**kwargs)
 
-class BaseValidator(_Descriptor, metaclass=ExtendedABCMeta):
+    def __set__(self, instance, value):
+        """
+        Run entire chain of validators, each one gets value returned by previous one, if any.
+        """
+        setter = vars(self).get("_setter")
+        if setter is None:
+            setter = vars(self)["_setter"] = compile_setter(self)
+        errors = []
+        setter(instance, value, errors, get_validation_mode(type(instance)))
+        if errors:
+            raise ValidationError(errors)
 
-    def __init_subclass__(cls, **kwargs):
-        """
-        Wrap all required methods into cache wrappers to prevent duplicate invocations.
-        """
-
-        def __cached_wrapper(func):
-            @functools.wraps(func)
-            def __inner(*args, **kw):
-                __inner.__called__ = True
-                ret = func(*args, **kw)
-                return ret
-
-            __inner.__wrapped__ = func
-            return __inner
-
-        for func_name in ("__setup__", "validate", "mutate"):
-            if hasattr(cls, func_name):
-                setattr(cls, func_name, __cached_wrapper(getattr(cls, func_name)))
-
-    def __init__(self, __mro__=None, **kwargs):
-        kw = {}
-        if not __mro__:
-            __mro__ = type(self).mro()
-        base, __mro__ = __mro__[0], __mro__[1:]
-
-        signature = inspect.signature(base.__setup__)
-        for parameter in signature.parameters.values():
-            if parameter.name in kwargs:
-                kw[parameter.name] = kwargs.pop(parameter.name)
-        if base.__setup__ is not BaseValidator.__setup__:
-            if not getattr(base.__setup__, "__called__", False):
-                try:
-                    base.__setup__(self, **kw)
-                except Exception:
-                    _invalidate_call_cache(self, target="__setup__")
-                    raise
-        super(base, self).__init__(__mro__=__mro__, **kwargs)
-
-    def __set__(self, instance, value, __mro__=None, errors=None):
-        errors = [] if errors is None else errors
-        if not __mro__:
-            __mro__ = type(self).mro()
-        base, __mro__ = __mro__[0], __mro__[1:]
-        if base.validate is not BaseValidator.validate:
-            if not getattr(base.validate, "__called__", False):
-                try:
-                    ret = base.validate(self, instance, value)
-                    if ret is not None:
-                        value = ret
-                except ValidationError as exc:
-                    if str(exc) not in errors:
-                        errors.append(str(exc))
-                except Exception:
-                    _invalidate_call_cache(self, target="validate")
-                    raise
-        super(base, self).__set__(instance, value, __mro__=__mro__, errors=errors)
-
-    def __get__(self, instance, owner, __mro__=None, value=UNSET):
+    def __get__(self, instance, owner):
         """
         Call entire chain of mutators and propagate value to each of them.
         E.g: mutate(mutate(mutate(value))) and so on.
         """
-        value = vars(instance)[self.field_name] if value is UNSET else value
-        if not __mro__:
-            __mro__ = type(self).mro()
-        base, __mro__ = __mro__[0], __mro__[1:]
-        if not getattr(base.mutate, "__called__", False):
-            try:
-                ret = base.mutate(self, instance, value)
-                if ret is not NotImplemented:
-                    value = ret
-            except Exception:
-                _invalidate_call_cache(self, target="mutate")
-                raise
-        return super(base, self).__get__(instance, owner, __mro__=__mro__, value=value)
+        value = vars(instance)[self.field_name]
+        if "_getter" not in vars(self):
+            vars(self)["_getter"] = compile_getter(self)
+        getter = vars(self)["_getter"]
+        return value if getter is None else getter(instance, value)
 
     def __setup__(self, *args, **kwargs):
         return NotImplemented
@@ -348,3 +445,183 @@ class BaseValidator(_Descriptor, metaclass=ExtendedABCMeta):
 
     def mutate(self, instance, value):
         return NotImplemented
+
+
+@functools.lru_cache(maxsize=1024)
+def collect_fields(cls, kinds=(BaseValidator,)):
+    """
+    Collect validator fields of ``cls``, including the ones inherited from its bases.
+    Fields keep the order of their first definition, overridden fields take the most derived validator.
+
+    Result is cached per class, call ``collect_fields.cache_clear()`` if fields are added to existing class.
+
+    :param cls: class to inspect
+    :param kinds: types of attributes to collect, e.g ``(BaseValidator, Alias)`` to collect aliases as well
+    :return: read-only mapping of ``{name: validator}``
+    """
+    fields = {}
+    for base in reversed(cls.__mro__):
+        for name, attr in vars(base).items():
+            if isinstance(attr, kinds):
+                fields[name] = attr
+            else:
+                fields.pop(name, None)
+    return MappingProxyType(fields)
+
+
+def _defines(cls, func_name):
+    """
+    Check whether validator class ``cls`` defines ``func_name`` itself rather than inheriting it.
+    """
+    return func_name in vars(cls) and cls is not BaseValidator
+
+
+def _explicit_calls(func, func_name):
+    """
+    Validator methods ``func`` calls explicitly by their class, e.g ``Type.validate(self, instance, value)``.
+    Names used by ``func`` are inspected rather than its bytecode, there's no need to import ``dis`` for that.
+    """
+    code = getattr(func, "__code__", None)
+    if code is None or func_name not in code.co_names:
+        return set()
+    called = set()
+    for name in code.co_names:
+        target = func.__globals__.get(name)
+        if isinstance(target, type) and issubclass(target, BaseValidator):
+            called.add(getattr(target, func_name))
+    return called
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_chain(cls, func_name):
+    """
+    Resolve ``func_name`` methods of validator class ``cls`` to plain functions, once per class.
+
+    Methods are taken in MRO order, each one only once. Methods called explicitly by other methods of the chain
+    (e.g ``Type.validate`` called from ``Dict.validate``) are left out, they run as part of the caller.
+
+    :return: tuple of ``(defining class, function)``
+    """
+    chain = []
+    for base in cls.__mro__:
+        if _defines(base, func_name) and all(vars(base)[func_name] is not func for _, func in chain):
+            chain.append((base, vars(base)[func_name]))
+    called = set()
+    for _, func in chain:
+        called.update(_explicit_calls(func, func_name))
+    return tuple((base, func) for base, func in chain if func not in called)
+
+
+def compile_validator(validator):
+    """
+    Resolve ``validate`` chain of ``validator`` once and return flat equivalent of it.
+
+    Returned callable accepts ``(instance, value, errors, mode)``, runs every ``validate`` in MRO order
+    (or by ``cost`` in ``COST_ORDERED`` mode) and returns validated value,
+    or ``INVALID`` in which case messages are appended to ``errors``.
+    If some validator crashes after previous one in chain rejected the value, the rest of the chain is skipped.
+    If it crashes while ``errors`` already has entries (e.g. it relies on a field which failed before),
+    ``ValidationError`` with collected errors is raised instead.
+    """
+    chain = _resolve_chain(type(validator), "validate")
+    ordered_chain = tuple(func for _, func in sorted(chain, key=lambda item: item[0].cost))
+    chain = tuple(func for _, func in chain)
+
+    def check(instance, value, errors, mode=COLLECT_ALL):
+        failed = False
+        for func in ordered_chain if mode == COST_ORDERED else chain:
+            try:
+                ret = func(validator, instance, value)
+                if ret is not None:
+                    value = ret
+            except ValidationError as exc:
+                failed = True
+                _add_errors(errors, exc)
+                if mode != COLLECT_ALL:
+                    break
+            except Exception as exc:
+                if failed:
+                    break  # e.g. ``Sized`` after failed ``String``, value is already known to be invalid
+                if errors:
+                    raise ValidationError(errors) from exc
+                raise
+        return INVALID if failed else value
+
+    return check
+
+
+def compile_setter(validator, intern=None):
+    """
+    Same as ``compile_validator``, but returned callable stores valid value on ``instance``
+    the way ``__set__`` does and returns nothing. In fail-fast modes it raises on invalid value straight away.
+    In ``TRUSTED`` mode value is stored without validation, unless validator is ``computed``.
+
+    :param intern: callable to pass valid value through before storing it, e.g ``sys.intern``
+    """
+    check = compile_validator(validator)
+    field_name = validator.field_name
+    trusted = None if validator.computed else TRUSTED
+
+    def setter(instance, value, errors, mode=COLLECT_ALL):
+        if mode == trusted:
+            vars(instance)[field_name] = value if intern is None else intern(value)
+            return
+        value = check(instance, value, errors, mode)
+        if value is not INVALID:
+            vars(instance)[field_name] = value if intern is None else intern(value)
+        elif mode != COLLECT_ALL:
+            raise ValidationError(errors)
+
+    return setter
+
+
+def compile_getter(validator):
+    """
+    Resolve ``mutate`` chain of ``validator`` once and return flat equivalent of its ``__get__``.
+
+    Returned callable accepts ``(instance, value)`` and returns mutated value.
+
+    :returns: callable or ``None`` if no validator in chain defines ``mutate``
+    """
+    chain = tuple(func for _, func in _resolve_chain(type(validator), "mutate"))
+    if not chain:
+        return None
+
+    def getter(instance, value):
+        for func in chain:
+            ret = func(validator, instance, value)
+            if ret is not NotImplemented:
+                value = ret
+        return value
+
+    return getter
+
+
+def compile_batch(validator):
+    """
+    Build whole-collection check for ``validator`` out of ``validate_many`` hooks of its chain.
+
+    ``validate_many(self, instance, values)`` is an optional validator method, it returns ``True`` only if every value
+    in ``values`` passes ``validate`` of its class (and the classes it inherits from) unchanged.
+    ``False`` means nothing, values should be validated one by one then.
+
+    :returns: callable ``(instance, values) -> bool`` or ``None`` if some validator in chain has no such hook
+    """
+    mro = type(validator).mro()
+    pending = [base for base, _ in _resolve_chain(type(validator), "validate")]
+    hooks = []
+    for owner in mro:
+        if "validate_many" not in vars(owner):
+            continue
+        covered = [base for base in pending if base in owner.__mro__]
+        if covered:
+            hooks.append(vars(owner)["validate_many"])
+            pending = [base for base in pending if base not in covered]
+    if pending:
+        return None
+    hooks = tuple(hooks)
+
+    def check_all(instance, values):
+        return all(hook(validator, instance, values) for hook in hooks)
+
+    return check_all
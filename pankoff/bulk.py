@@ -0,0 +1,516 @@
+import csv
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from itertools import islice
+
+from pankoff.base import TRUSTED, UNSET, _validation_mode, collect_fields, compile_batch, validation_mode
+from pankoff.exceptions import ErrorBudgetExceeded, ValidationError
+
+_TRUE = frozenset(("1", "true", "yes", "y", "on"))
+_FALSE = frozenset(("0", "false", "no", "n", "off"))
+
+
+def _parse_number(value):
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _parse_bool(value):
+    lowered = value.strip().lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ValueError(f"Not a boolean: {value!r}")
+
+
+class Sampling:
+    """
+    Validate only a sample of records coming from a trusted source, the rest are loaded in ``TRUSTED`` mode.
+    Once failure rate of validated records exceeds ``threshold``, every following record is validated.
+
+    Same policy can be shared between calls to keep statistics in one place:
+
+    >>> sampling = Sampling(every=100)
+    >>> people = [Person.from_dict(record, sampling=sampling) for record in feed]
+    >>> sampling.stats()
+    {'seen': 10000, 'validated': 100, 'failed': 1, 'failure_rate': 0.01, 'full_validation': False,
+     'errors': {'Attribute `age` should be >= 18': 1}}
+
+    :param every: validate one record out of ``every``, starting from the first one
+    :param per_second: validate at most ``per_second`` records per second
+    :param threshold: failure rate of validated records, defaults to ``0.01``
+    :param min_samples: number of validated records needed before ``threshold`` is checked, defaults to ``100``
+    """
+
+    def __init__(self, every=None, per_second=None, threshold=0.01, min_samples=100):
+        if (every is None) == (per_second is None):
+            raise ValueError("Pass either `every` or `per_second`")
+        if every is not None and every < 1:
+            raise ValueError("`every` should be >= 1")
+        if per_second is not None and per_second <= 0:
+            raise ValueError("`per_second` should be > 0")
+        self.every = every
+        self.interval = None if per_second is None else 1 / per_second
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.seen = 0
+        self.validated = 0
+        self.failed = 0
+        self.errors = Counter()
+        self.full_validation = False
+        self._next_sample = 0
+
+    @property
+    def failure_rate(self):
+        return self.failed / self.validated if self.validated else 0.0
+
+    def should_validate(self):
+        """
+        Count next record and decide whether it should be validated.
+        """
+        self.seen += 1
+        if self.full_validation:
+            return True
+        if self.every is not None:
+            return (self.seen - 1) % self.every == 0
+        now = time.monotonic()
+        if now < self._next_sample:
+            return False
+        self._next_sample = now + self.interval
+        return True
+
+    def record(self, error=None):
+        """
+        Count validated record, ``error`` is ``ValidationError`` it failed with, if any.
+        """
+        self.validated += 1
+        if error is None:
+            return
+        self.failed += 1
+        self.errors.update(error.errors if isinstance(error.errors, list) else [str(error)])
+        if self.validated >= self.min_samples and self.failure_rate > self.threshold:
+            self.full_validation = True
+
+    def construct(self, cls, data, mode=None):
+        """
+        Make an instance of ``cls`` from ``data``, validated or trusted, see ``Container.from_dict``.
+        """
+        if not self.should_validate():
+            with validation_mode(TRUSTED):
+                return cls(**data)
+        try:
+            instance = cls.from_dict(data, mode=mode)
+        except ValidationError as exc:
+            self.record(exc)
+            raise
+        self.record()
+        return instance
+
+    def stats(self):
+        """
+        :return: dict with counts of seen, validated and failed records, failure rate, whether full validation
+         is on, and counts of error messages
+        """
+        return {
+            "seen": self.seen,
+            "validated": self.validated,
+            "failed": self.failed,
+            "failure_rate": self.failure_rate,
+            "full_validation": self.full_validation,
+            "errors": dict(self.errors),
+        }
+
+
+def column_converter(validator):
+    """
+    Pick a converter from CSV string to the type ``validator`` expects, based on its ``types``.
+
+    :returns: callable or ``None`` if string should be passed as is
+    """
+    types = getattr(validator, "types", ())
+
+    def accepts(kind):
+        return all(issubclass(kind, type_) for type_ in types)
+
+    if not types or accepts(str):
+        return None
+    if bool in types:
+        return _parse_bool
+    if accepts(int) and accepts(float):
+        return _parse_number
+    if accepts(int):
+        return int
+    if accepts(float):
+        return float
+    return None
+
+
+class JsonlSink:
+    """
+    Append rejected records to JSON Lines file, one ``{"position": ..., "record": ..., "errors": [...]}``
+    object per line. Each batch is written at once. Values JSON can't encode are written as their ``repr``.
+
+    :param path: file path
+    :param encoding: file encoding, defaults to ``utf-8``
+    """
+
+    def __init__(self, path, encoding="utf-8"):
+        import json
+
+        self.path = path
+        self._fp = open(path, "a", encoding=encoding)
+        self._encode = json.JSONEncoder(default=repr, ensure_ascii=False).encode
+
+    def __call__(self, batch):
+        encode = self._encode
+        self._fp.write("".join(
+            encode({"position": position, "record": record, "errors": errors}) + "\n"
+            for position, record, errors in batch
+        ))
+        self._fp.flush()
+
+    def close(self):
+        self._fp.close()
+
+
+class Quarantine:
+    """
+    Collect rejected records in batches and pass them to ``sink`` from a background thread,
+    so writing doesn't slow down validation.
+
+    :param sink: path of JSON Lines file (see :class:`JsonlSink`) or callable which accepts list of
+     ``(position, record, errors)`` tuples. Sink is closed along with quarantine if it has ``close`` method
+    :param batch_size: number of records to pass to ``sink`` at once, defaults to ``1000``
+    """
+
+    def __init__(self, sink, batch_size=1000):
+        if isinstance(sink, (str, os.PathLike)):
+            sink = JsonlSink(sink)
+        self.sink = sink
+        self.batch_size = batch_size
+        self.count = 0
+        self._batch = []
+        self._queue = queue.Queue(maxsize=16)
+        self._error = None
+        self._thread = None
+
+    def _write(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            if self._error is None:
+                try:
+                    self.sink(batch)
+                except BaseException as exc:
+                    self._error = exc
+
+    def put(self, position, record, errors):
+        self.count += 1
+        self._batch.append((position, record, errors))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Pass collected records to the writer thread.
+        """
+        if self._error is not None:
+            raise self._error
+        if not self._batch:
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write, name="pankoff-quarantine", daemon=True)
+            self._thread.start()
+        self._queue.put(self._batch)
+        self._batch = []
+
+    def close(self):
+        """
+        Write what's left, wait for the writer thread and close ``sink``.
+        """
+        try:
+            self.flush()
+        finally:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+            close = getattr(self.sink, "close", None)
+            if close is not None:
+                close()
+        if self._error is not None:
+            raise self._error
+
+
+class ErrorBudget:
+    """
+    Abort bulk job once too many records are rejected, by raising :class:`pankoff.exceptions.ErrorBudgetExceeded`.
+
+    :param count: max number of rejected records
+    :param ratio: max ratio of rejected records to processed ones
+    :param min_records: number of processed records needed before ``ratio`` is checked, defaults to ``100``
+    """
+
+    def __init__(self, count=None, ratio=None, min_records=100):
+        if count is None and ratio is None:
+            raise ValueError("Pass `count`, `ratio` or both")
+        self.count = count
+        self.ratio = ratio
+        self.min_records = min_records
+
+    def check(self, processed, rejected):
+        if (
+            (self.count is not None and rejected > self.count)
+            or (self.ratio is not None and processed >= self.min_records and rejected / processed > self.ratio)
+        ):
+            raise ErrorBudgetExceeded(processed, rejected)
+
+
+def _as_budget(error_budget):
+    if error_budget is None or isinstance(error_budget, ErrorBudget):
+        return error_budget
+    if isinstance(error_budget, float):
+        return ErrorBudget(ratio=error_budget)
+    return ErrorBudget(count=error_budget)
+
+
+def _prefixed(label, position, messages):
+    return [f"{label} {position}: {message}" for message in messages]
+
+
+def _init_parameters(cls):
+    """
+    Names of keyword arguments ``cls.__init__`` accepts and the required ones, read from its code object.
+    Accepted names are ``None`` if it takes ``**kwargs``, both are ``None`` if signature can't be read.
+    """
+    init = cls.__init__
+    code = getattr(init, "__code__", None)
+    if code is None:
+        return None, None
+    positional = code.co_varnames[1:code.co_argcount]  # skip `self`
+    keyword_only = code.co_varnames[code.co_argcount:code.co_argcount + code.co_kwonlyargcount]
+    required = positional[:len(positional) - len(init.__defaults__ or ())]
+    required += tuple(name for name in keyword_only if name not in (init.__kwdefaults__ or {}))
+    accepted = None if code.co_flags & 0x08 else frozenset(positional + keyword_only)
+    return accepted, frozenset(required)
+
+
+def record_items(cls, records):
+    """
+    Make items for :func:`load_records` out of ``records``, rejecting the ones ``cls`` can't be called with:
+    not mappings, missing required arguments or having unknown ones.
+    """
+    from collections.abc import Mapping
+
+    accepted, required = _init_parameters(cls)
+    for index, record in enumerate(records):
+        if type(record) is not dict and not isinstance(record, Mapping):
+            yield index, record, None, [f"Record should be a mapping, got `{type(record).__name__}`"]
+        elif required is None or (required <= record.keys() and (accepted is None or record.keys() <= accepted)):
+            yield index, record, record, None
+        else:
+            messages = []
+            missing = required - record.keys()
+            if missing:
+                messages.append(f"Missing attributes: {', '.join(f'`{name}`' for name in sorted(missing))}")
+            unknown = [] if accepted is None else [name for name in record if name not in accepted]
+            if unknown:
+                messages.append(f"Unknown attributes: {', '.join(f'`{name}`' for name in unknown)}")
+            yield index, record, None, messages
+
+
+def column_checks(cls):
+    """
+    Whole-column checks for fields of ``cls``, built out of ``validate_many`` hooks (see ``compile_batch``).
+    Hooks get ``None`` as ``instance``. Computed fields (e.g ``LazyLoad``) are left out, they run anyway.
+
+    :returns: ``{name: check_all}`` or ``None`` if some field can't be checked as a whole
+    """
+    checks = {}
+    for name, field in collect_fields(cls).items():
+        if field.computed:
+            continue
+        check_all = compile_batch(field)
+        if check_all is None:
+            return None
+        checks[name] = check_all
+    return checks
+
+
+def _columns_valid(columns, batch):
+    records = [data for _, _, data, messages in batch if messages is None]
+    if not records:
+        return False
+    for name, check_all in columns.items():
+        try:
+            column = [data[name] for data in records]
+        except KeyError:  # default is used by some record, leave it to validation one by one
+            return False
+        if not check_all(None, column):
+            return False
+    return True
+
+
+def _batches(items, columns, batch_size):
+    """
+    Split ``items`` into ``(batch, trusted)`` pairs, ``trusted`` is ``True`` if every column of batch passed
+    its check. Without ``columns`` all of ``items`` go as single untrusted batch.
+    """
+    if columns is None:
+        yield items, False
+        return
+    items = iter(items)
+    while True:
+        batch = list(islice(items, batch_size))
+        if not batch:
+            return
+        yield batch, _columns_valid(columns, batch)
+
+
+def _build_trusted(cls, batch):
+    """
+    Make instances for whole ``batch`` in ``TRUSTED`` mode, before any of them is yielded.
+    Data of each item is replaced with instance, or messages are set if it still failed (e.g. ``LazyLoad`` crashed).
+    """
+    built = []
+    token = _validation_mode.set(TRUSTED)
+    try:
+        for position, raw, data, messages in batch:
+            if messages is None:
+                try:
+                    data = cls(**data)
+                except ValidationError as exc:
+                    messages = exc.errors if isinstance(exc.errors, list) else [str(exc)]
+            built.append((position, raw, data, messages))
+    finally:
+        _validation_mode.reset(token)
+    return built
+
+
+def load_records(cls, items, label="Record", raw_record=None, on_error=None, mode=None, sampling=None, sink=None,
+                 error_budget=None, batch_size=1000):
+    """
+    Validate ``(position, raw, data, messages)`` items and yield instances of ``cls``, see ``Container.from_records``.
+    ``messages`` are errors found before validation (e.g. parsing) or ``None``, ``raw_record`` makes record
+    to report out of ``raw``, it's called only for rejected ones.
+
+    If every field of ``cls`` generated ``__init__`` sets supports ``validate_many``, records are checked column by
+    column in batches of ``batch_size`` first, batches which pass are loaded without validating records one by one.
+    """
+    build = cls if mode is None else lambda **data: cls.from_dict(data, mode=mode)
+    if sampling is not None:
+        build = lambda **data: sampling.construct(cls, data, mode=mode)  # noqa: E731
+    columns = None
+    if sampling is None and mode != TRUSTED and getattr(cls.__init__, "__merged_init__", UNSET) is None:
+        columns = column_checks(cls)
+    quarantine = sink if sink is None or isinstance(sink, Quarantine) else Quarantine(sink)
+    budget = _as_budget(error_budget)
+    processed = rejected = 0
+    try:
+        for batch, trusted in _batches(items, columns, batch_size):
+            if trusted:
+                batch = _build_trusted(cls, batch)
+            for position, raw, data, messages in batch:
+                processed += 1
+                if messages is None and trusted:
+                    yield data
+                    continue
+                if messages is None:
+                    try:
+                        instance = build(**data)
+                    except ValidationError as exc:
+                        messages = exc.errors if isinstance(exc.errors, list) else [str(exc)]
+                    else:
+                        yield instance
+                        continue
+                rejected += 1
+                if raw_record is not None:
+                    raw = raw_record(raw)
+                if quarantine is not None:
+                    quarantine.put(position, raw, messages)
+                if on_error is not None:
+                    on_error(position, raw, ValidationError(_prefixed(label, position, messages)))
+                elif quarantine is None:
+                    raise ValidationError(_prefixed(label, position, messages))
+                if budget is not None:
+                    budget.check(processed, rejected)
+        if budget is not None and rejected:
+            budget.check(processed, rejected)  # `min_records` may be reached after last rejected record
+    finally:
+        if quarantine is not None:
+            quarantine.close()
+
+
+def read_csv(cls, fp, converters=None, on_error=None, mode=None, sampling=None, sink=None, error_budget=None,
+             **fmtparams):
+    """
+    Read CSV rows from ``fp`` and yield validated instances of ``cls``, see ``Container.from_csv``.
+    """
+    from pankoff.validators import LazyLoad
+
+    reader = csv.reader(fp, **fmtparams)
+    try:
+        header = next(reader)
+    except StopIteration:
+        return iter(())
+    fields = collect_fields(cls)
+    accepted, required = _init_parameters(cls)
+    columns = {name for name in header if not isinstance(fields.get(name), LazyLoad)}
+    messages = []
+    if required is not None and required - columns:
+        messages.append(f"Missing columns: {', '.join(f'`{name}`' for name in sorted(required - columns))}")
+    if accepted is not None and columns - accepted:
+        messages.append(f"Unknown columns: {', '.join(f'`{name}`' for name in header if name in columns - accepted)}")
+    if messages:
+        raise ValidationError(_prefixed("Line", reader.line_num, messages))
+    converters = dict(converters or {})
+    width = len(header)
+    names = tuple(header)
+    parsers = []
+    optional = []
+    skipped = []
+    for name in names:
+        field = fields.get(name)
+        if isinstance(field, LazyLoad):
+            skipped.append(name)
+            continue
+        convert = converters[name] if name in converters else (field and column_converter(field))
+        if convert is not None:
+            parsers.append((name, convert))
+        if field is not None and (field.default_value is not UNSET or field.default_factory is not UNSET):
+            optional.append(name)
+    parsers, optional, skipped = tuple(parsers), tuple(optional), tuple(skipped)
+
+    def items():
+        for row in reader:
+            line = reader.line_num
+            if len(row) != width:
+                yield line, row, None, [f"Expected {width} columns, got {len(row)}"]
+                continue
+            data = dict(zip(names, row))
+            for name in skipped:
+                del data[name]
+            for name in optional:
+                if not data[name]:
+                    del data[name]
+            messages = None
+            for name, convert in parsers:
+                if name in data:
+                    try:
+                        data[name] = convert(data[name])
+                    except (TypeError, ValueError):
+                        messages = [f"Attribute `{name}` can not be parsed from {data[name]!r}"]
+                        break
+            yield line, row, data, messages
+
+    return load_records(
+        cls, items(), label="Line", raw_record=lambda row: dict(zip(names, row)), on_error=on_error, mode=mode,
+        sampling=sampling, sink=sink, error_budget=error_budget
+    )
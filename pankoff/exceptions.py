@@ -8,3 +8,22 @@ class ValidationError(ValueError):
 
 class InconsistentOrderError(TypeError):
     pass
+
+
+class FrozenInstanceError(AttributeError):
+    pass
+
+
+class ErrorBudgetExceeded(ValidationError):
+    """
+    Raised by bulk loaders once too many records are rejected.
+
+    :param processed: number of records processed so far
+    :param rejected: number of rejected records
+    """
+    def __init__(self, processed, rejected):
+        errors = [f"Error budget exceeded: {rejected} of {processed} records rejected"]
+        ValueError.__init__(self, errors)
+        self.errors = errors
+        self.processed = processed
+        self.rejected = rejected
@@ -1,19 +1,175 @@
-import inspect
-import textwrap
+import types
 
-from pankoff.base import BaseValidator
+from pankoff.base import collect_fields, compile_getter, compile_setter, get_validation_mode
+from pankoff.exceptions import FrozenInstanceError, ValidationError
 from pankoff.validators import UNSET, LazyLoad
 
 init_template = "def __init__({arguments}):\n\t{assignments}"
+eq_template = """def __eq__(self, other):
+\tif other.__class__ is not self.__class__:
+\t\treturn NotImplemented
+\tfields, other_fields = self.__dict__, other.__dict__
+\treturn {fields} == {other_fields}"""
+hash_template = """def __hash__(self):
+\tfields = self.__dict__
+\treturn hash({fields})"""
+key_template = """def {name}(self):
+\tfields = self.__dict__
+\treturn {fields}"""
+order_template = """def {name}(self, other):
+\tif other.__class__ is not self.__class__:
+\t\treturn NotImplemented
+\treturn self.sort_key() {operator} other.sort_key()"""
+diff_template = """def diff(self, other, first=False):
+\tif other.__class__ is not self.__class__:
+\t\traise TypeError(f"Can not diff {{self.__class__.__name__}} against {{other.__class__.__name__}}")
+\tfields, other_fields = self.__dict__, other.__dict__
+\tret = {{}}
+\t{checks}
+\treturn ret"""
+diff_check_template = """value, other_value = {value}, {other_value}
+\tif value != other_value:
+\t\tret[{name!r}] = (value, other_value)
+\t\tif first:
+\t\t\treturn ret"""
+
+_initializing = set()
+
+
+def _as_tuple(items):
+    return "({}{})".format(", ".join(items), "," if len(items) == 1 else "")
+
+
+def _fields_tuple(names, source):
+    return _as_tuple([f"{source}[{name!r}]" for name in names])
+
+
+def _make_function(template, namespace, verbose, cls, **kwargs):
+    source = template.format(**kwargs)
+    name = source[len("def "):source.index("(")]
+    if verbose:
+        print(f"Generated {name} method for {cls}\n{source}")
+    exec(source, namespace)
+    namespace[name].__generated__ = True
+    return namespace[name]
+
+
+def _user_defined(cls, name):
+    method = vars(cls).get(name)
+    return method is not None and not getattr(method, "__generated__", False)
+
+
+def _comparison_methods(cls, values, other_values, namespace, verbose, key_name):
+    """
+    Generate ``__eq__``, ``__hash__`` and key method named ``key_name`` out of field value expressions,
+    used by both ``autoinit(frozen=True)`` and ``comparable``.
+    """
+    fields = _as_tuple(values)
+    return {
+        "__eq__": _make_function(
+            eq_template, dict(namespace), verbose, cls, fields=fields, other_fields=_as_tuple(other_values)
+        ),
+        "__hash__": _make_function(hash_template, dict(namespace), verbose, cls, fields=fields),
+        key_name: _make_function(key_template, dict(namespace), verbose, cls, name=key_name, fields=fields),
+    }
+
+
+def _frozen_setattr(self, name, value):
+    if id(self) not in _initializing:
+        raise FrozenInstanceError(f"Cannot assign to `{name}`, `{type(self).__name__}` instances are frozen")
+    object.__setattr__(self, name, value)
+
+
+def _frozen_delattr(self, name):
+    if id(self) not in _initializing:
+        raise FrozenInstanceError(f"Cannot delete `{name}`, `{type(self).__name__}` instances are frozen")
+    object.__delattr__(self, name)
 
 
-def autoinit(klass=None, verbose=False, merge=False):
+def _value_interner():
+    """
+    Make ``intern(value)`` returning already seen value equal to ``value`` of the same type, if it's still alive.
+    Seen values are weakly referenced, table is keyed by ``(type, hash)`` so it holds no strong reference to them.
+    """
+    import sys
+    import weakref
+
+    seen = {}
+
+    def intern(value):
+        kind = type(value)
+        if kind is str:
+            return sys.intern(value)
+        if not kind.__weakrefoffset__:
+            return value
+        try:
+            key = (kind, hash(value))
+        except TypeError:  # unhashable
+            return value
+        refs = seen.get(key)
+        if refs is not None:
+            for ref in refs:
+                existing = ref()
+                if existing is not None and existing == value:
+                    return existing
+
+        def forget(ref):
+            alive = seen.get(key)
+            if alive is not None:
+                alive.remove(ref)
+                if not alive:
+                    del seen[key]
+
+        seen.setdefault(key, []).append(weakref.ref(value, forget))
+        return value
+
+    return intern
+
+
+def _interning(cls, key, populate):
+    """
+    Make ``cls`` return already existing equal instance, if there's one.
+    Instance is populated by ``populate`` (generated ``__init__``) in ``__new__``, so it's known before it's returned,
+    ``cls.__init__`` is expected to do nothing then. Subclasses with their own ``__init__`` aren't interned.
+    Types of field values are part of the key, so that ``1`` and ``1.0`` are not mixed up.
+    """
+    import weakref
+
+    instances = weakref.WeakValueDictionary()
+    make = cls.__new__
+    noop_init = cls.__init__
+
+    def __new__(klass, *args, **kwargs):
+        instance = make(klass) if make is object.__new__ else make(klass, *args, **kwargs)
+        if klass.__init__ is not noop_init:  # e.g subclass decorated with ``autoinit``, it populates instance itself
+            return instance
+        populate(instance, *args, **kwargs)
+        values = key(instance)
+        try:
+            return instances.setdefault((klass, values, tuple(map(type, values))), instance)
+        except TypeError:  # unhashable fields
+            return instance
+
+    cls.__new__ = __new__
+    cls.__interned__ = instances
+    return cls
+
+
+def autoinit(klass=None, verbose=False, merge=False, frozen=False, intern=None):
     """
     Auto generates ``__init__`` method for your class based on its validators.
 
     :param merge: in case you have existing ``__init__`` in your class, you can merge them
     :type merge: bool
 
+    :param frozen: make instances immutable, see :ref:`Frozen instances`
+    :type frozen: bool
+
+    :param intern: either ``"values"`` to deduplicate equal field values
+     or ``"instances"`` to deduplicate equal instances of frozen class without merged ``__init__``,
+     defaults to ``None``
+    :type intern: str, optional
+
     :param klass: Class to decorate
     :type klass: type
 
@@ -37,7 +193,28 @@ def autoinit(klass=None, verbose=False, merge=False):
 
         Generated __init__ method for <class '__main__.Person'>
         def __init__(self, name):
-            self.name = name
+            __mode = __get_mode(self.__class__)
+            __errors = []
+            __setter_name(self, name, __errors, __mode)
+            if __errors:
+                raise ValidationError(__errors)
+
+    Generated ``__init__`` doesn't go through descriptors, validation chain of each field is resolved once
+    and called directly. Errors of all fields are collected and raised together as single ``ValidationError``,
+    unless fail-fast validation mode is used, see :func:`pankoff.base.validation_mode`.
+    Fields inherited from base classes are picked up as well.
+
+    Fields can have defaults, use ``default_value`` or ``default_factory`` (called without arguments):
+
+    .. code-block:: python
+
+        @autoinit
+        class Person:
+            name = String()
+            kind = String(default_value="Good person")
+            tags = List(default_factory=list)
+
+    Parameters with defaults are moved to the end of the signature. Defaults are validated as any other value.
 
     You can merge existing ``__init__`` with generated one by using ``merge=True``, e.g:
 
@@ -57,7 +234,11 @@ def autoinit(klass=None, verbose=False, merge=False):
 
         Generated __init__ method for <class '__main__.Person'>
         def __init__(self, name, *args, **kwargs):
-            self.name = name
+            __mode = __get_mode(self.__class__)
+            __errors = []
+            __setter_name(self, name, __errors, __mode)
+            if __errors:
+                raise ValidationError(__errors)
             user_defined_init(self, *args, **kwargs)
 
     As you can see, you can use ``self.name`` straight away.
@@ -68,37 +249,153 @@ def autoinit(klass=None, verbose=False, merge=False):
         print(person.full_name)  # Yaroslav Pankovych
     """
 
+    if intern not in (None, "values", "instances"):
+        raise ValueError(f"`intern` should be either \"values\" or \"instances\", got {intern!r}")
+    if intern == "instances" and not frozen:
+        raise ValueError("Only frozen instances can be interned, pass `frozen=True`")
+
     def inner(cls):
-        has_default_init = cls.__init__ is object.__init__
+        has_default_init = "__init__" not in vars(cls)
         if not has_default_init and not merge:
             raise RuntimeError(f"{cls} already has __init__ method defined, pass `merge=True` to merge them")
+        if not has_default_init and intern == "instances":
+            raise ValueError("Instances with merged `__init__` can't be interned, its arguments aren't fields")
+        fields = collect_fields(cls)
+        interner = _value_interner() if intern else None
 
         attrs = ["self"]
-        assignments = []
-        namespace = {"UNSET": UNSET}
-        for attr in vars(cls).values():
-            if isinstance(attr, BaseValidator):
-                if not isinstance(attr, LazyLoad):
-                    attrs.append(attr.field_name)
-                if isinstance(attr, LazyLoad):
-                    assignments.append(f"self.{attr.field_name} = UNSET")
-                else:
-                    assignments.append(f"self.{attr.field_name} = {attr.field_name}")
+        assignments = ["__mode = __get_mode(self.__class__)", "__errors = []"]
+        namespace = {
+            "UNSET": UNSET,
+            "ValidationError": ValidationError,
+            "__get_mode": get_validation_mode,
+        }
+        for attr in fields.values():
+            name = attr.field_name
+            namespace[f"__setter_{name}"] = compile_setter(attr, intern=interner)
+            if isinstance(attr, LazyLoad):
+                assignments.append(f"__setter_{name}(self, UNSET, __errors, __mode)")
+                continue
+            if attr.default_factory is not UNSET:
+                namespace[f"__factory_{name}"] = attr.default_factory
+                attrs.append(f"{name}=UNSET")
+                assignments.append(f"if {name} is UNSET:\n\t\t{name} = __factory_{name}()")
+            elif attr.default_value is not UNSET:
+                namespace[f"__default_{name}"] = attr.default_value
+                attrs.append(f"{name}=__default_{name}")
+            else:
+                attrs.append(name)
+            assignments.append(f"__setter_{name}(self, {name}, __errors, __mode)")
         attrs.sort(key=lambda item: "=" in item)  # move default parameters to the end
+        assignments.append("if __errors:\n\t\traise ValidationError(__errors)")
 
         if merge and not has_default_init:
             namespace["user_defined_init"] = cls.__init__
             attrs.extend(("*args", "**kwargs"))
-            assignments.append("user_defined_init(self, *args, **kwargs)")
-
-        init = init_template.format(
+            if frozen:
+                namespace["__initializing"] = _initializing
+                assignments.append(
+                    "__initializing.add(id(self))\n\ttry:\n\t\tuser_defined_init(self, *args, **kwargs)"
+                    "\n\tfinally:\n\t\t__initializing.discard(id(self))"
+                )
+            else:
+                assignments.append("user_defined_init(self, *args, **kwargs)")
+
+        cls.__init__ = _make_function(
+            init_template, namespace, verbose, cls,
             arguments=", ".join(attrs),
-            assignments="\n\t".join(assignments or ["pass"])
+            assignments="\n\t".join(assignments)
+        )
+        cls.__init__.__merged_init__ = namespace.get("user_defined_init")
+        if frozen:
+            names = [attr.field_name for attr in fields.values()]
+            cls.__setattr__ = _frozen_setattr
+            cls.__delattr__ = _frozen_delattr
+            methods = _comparison_methods(
+                cls, [f"fields[{name!r}]" for name in names], [f"other_fields[{name!r}]" for name in names],
+                {}, verbose, "__key__"
+            )
+            if "__eq__" not in vars(cls):
+                cls.__eq__ = methods["__eq__"]
+            if "__hash__" not in vars(cls) or vars(cls)["__hash__"] is None:
+                cls.__hash__ = methods["__hash__"]
+            if intern == "instances":
+                populate = cls.__init__
+                cls.__init__ = _make_function(init_template, namespace, False, cls, arguments=", ".join(attrs),
+                                              assignments="pass")
+                cls.__init__.__merged_init__ = populate.__merged_init__
+                return _interning(cls, methods["__key__"], populate)
+        return cls
+
+    if klass is not None:
+        return inner(klass)
+    return inner
+
+
+def _field_value(name, source, instance, getters):
+    value = f"{source}[{name!r}]"
+    return f"__get_{name}({instance}, {value})" if name in getters else value
+
+
+def comparable(klass=None, verbose=False, mutated=False, order=True):
+    """
+    Generate ``__eq__``, ``__hash__``, ordering methods, ``sort_key()`` and ``diff(other)`` based on fields.
+    Fields are compared in definition order, comparison code is generated once per class.
+
+    :param mutated: compare values returned by ``mutate`` chains instead of stored ones, defaults to ``False``
+    :type mutated: bool
+
+    :param order: generate ``__lt__``, ``__le__``, ``__gt__`` and ``__ge__``, defaults to ``True``
+    :type order: bool
+
+    :param verbose: print out generated source, defaults to ``False``
+    :type verbose: bool
+
+    .. code-block:: python
+
+        @comparable
+        @autoinit
+        class Person(Container):
+            name = String()
+            age = Number()
+
+        old, new = Person(name="John", age=18), Person(name="John", age=19)
+        old < new  # True
+        old.sort_key()  # ("John", 18)
+        old.diff(new)  # {"age": (18, 19)}
+        old.diff(new, first=True)  # stops on first difference, use it if you only need to know there is one
+
+    Methods defined by the class itself are kept, e.g custom ``__eq__`` or ``sort_key``.
+    Only instances of the same class are compared. Don't change instances while they're used as dict keys
+    or in sets, use ``autoinit(frozen=True)`` to make sure of that.
+    """
+
+    def inner(cls):
+        names = list(collect_fields(cls))
+        namespace = {}
+        getters = {}
+        if mutated:
+            for name, field in collect_fields(cls).items():
+                getter = compile_getter(field)
+                if getter is not None:
+                    getters[name] = namespace[f"__get_{name}"] = getter
+
+        values = [_field_value(name, "fields", "self", getters) for name in names]
+        other_values = [_field_value(name, "other_fields", "other", getters) for name in names]
+        methods = _comparison_methods(cls, values, other_values, namespace, verbose, "sort_key")
+        if order:
+            for name, operator in (("__lt__", "<"), ("__le__", "<="), ("__gt__", ">"), ("__ge__", ">=")):
+                methods[name] = _make_function(order_template, {}, verbose, cls, name=name, operator=operator)
+        checks = [
+            diff_check_template.format(name=name, value=value, other_value=other)
+            for name, value, other in zip(names, values, other_values)
+        ]
+        methods["diff"] = _make_function(
+            diff_template, dict(namespace), verbose, cls, checks="\n\t".join(checks) or "pass"
         )
-        if verbose:
-            print(f"Generated __init__ method for {cls}\n{init}")
-        exec(init, namespace)
-        cls.__init__ = namespace["__init__"]
+        for name, method in methods.items():
+            if not _user_defined(cls, name):
+                setattr(cls, name, method)
         return cls
 
     if klass is not None:
@@ -107,6 +404,8 @@ def autoinit(klass=None, verbose=False, merge=False):
 
 
 def _replace_method(method):
+    import textwrap
+
     ns = {
         "UNSET": UNSET,
         "method": method
@@ -129,7 +428,7 @@ class MixinMeta(type):
         nss = []
         if all(issubclass(base, MagicMixin) for base in bases):
             for k, v in namespace.items():
-                if inspect.isfunction(v) or isinstance(v, classmethod):
+                if isinstance(v, (types.FunctionType, classmethod)):
                     new_f, ns = _replace_method(v)
                     namespace[k] = new_f
                     nss.append(ns)
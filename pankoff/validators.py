@@ -1,7 +1,17 @@
 import collections.abc
+import functools
 import numbers
 
-from pankoff.base import BaseValidator
+from pankoff import base
+from pankoff.base import (
+    COLLECT_ALL,
+    INVALID,
+    UNSET,
+    BaseValidator,
+    compile_batch,
+    compile_validator,
+    get_validation_mode
+)
 from pankoff.exceptions import ValidationError
 
 __all__ = [
@@ -31,14 +41,16 @@ __all__ = [
     "List",
     "Dict",
     "Tuple",
+    "ListOf",
+    "DictOf",
+    "TupleOf",
     "Number",
     "Predicate",
+    "Pattern",
     "LazyLoad"
 ]
 
-UNSET = object()
-
-primitive_types = (
+primitive_types = {primitive.__name__: primitive for primitive in (
     collections.abc.Container,
     collections.abc.Hashable,
     collections.abc.Iterable,
@@ -59,7 +71,7 @@ primitive_types = (
     collections.abc.AsyncIterable,
     collections.abc.AsyncIterator,
     collections.abc.AsyncGenerator,
-)
+)}
 
 
 class Sized(BaseValidator):
@@ -73,6 +85,8 @@ class Sized(BaseValidator):
     :type max_size: int, optional
     """
 
+    cost = 0
+
     def __setup__(self, min_size=None, max_size=None):
         self.min_size = min_size
         self.max_size = max_size
@@ -83,12 +97,22 @@ class Sized(BaseValidator):
         elif self.max_size is not None and len(value) > self.max_size:
             raise ValidationError(f"Attribute `{self.field_name}` length should be <= {self.max_size}")
 
+    def validate_many(self, instance, values):
+        sizes = list(map(len, values))
+        if not sizes:
+            return True
+        if self.min_size is not None and min(sizes) < self.min_size:
+            return False
+        return self.max_size is None or max(sizes) <= self.max_size
+
 
 class Type(BaseValidator):
     """
     Validate whether field is instance of at least one type in ``types``.
     """
 
+    cost = 0
+
     def __setup__(self, types):
         if hasattr(self, "types"):
             self.types += types
@@ -102,6 +126,12 @@ class Type(BaseValidator):
                 f"Attribute `{self.field_name}` should be an instance of `{types_names}`"
             )
 
+    def validate_many(self, instance, values):
+        return all(
+            all(issubclass(kind, type_) for type_ in self.types)
+            for kind in set(map(type, values))
+        )
+
 
 class String(Type):
     """
@@ -128,11 +158,11 @@ class Dict(Type):
 
     def __setup__(self, types=(dict,), required_keys=UNSET):
         Type.__setup__(self, types)
-        self.required_keys = required_keys
+        self.required_keys = UNSET if required_keys in (UNSET, None) else frozenset(required_keys)
 
     def validate(self, instance, value):
         Type.validate(self, instance, value)
-        if self.required_keys is not UNSET and not all(key in value for key in self.required_keys):
+        if self.required_keys is not UNSET and not self.required_keys <= value.keys():
             raise ValidationError(
                 f"Missing required keys for value in `{self.field_name}` field"
             )
@@ -147,6 +177,231 @@ class Tuple(Type):
         Type.__setup__(self, types)
 
 
+_ELEMENT = "\x00element\x00"  # stands for element path in messages, replaced once element is known to be invalid
+
+
+def _unset_none(item):
+    return UNSET if item is None else item
+
+
+def _changes_value(item):
+    """
+    Whether validating against ``item`` may replace the value, e.g ``Container`` model makes instances of mappings.
+    Collections of such items have to be validated even in ``TRUSTED`` mode, to get the same value either way.
+    """
+    if isinstance(item, type):
+        return issubclass(item, base.Container)
+    return item is not UNSET and item.computed
+
+
+def _element_check(item):
+    """
+    Make ``(check, check_all)`` pair for collection elements, ``item`` is either validator or ``Container`` model.
+
+    ``check(instance, value, errors, mode)`` returns validated value or ``INVALID``, messages refer to the element
+    as ``_ELEMENT``. ``check_all(instance, values)`` is a fast whole-collection check, it's ``None`` if not available.
+    Validator ``item`` is copied, so it can be shared between fields.
+    """
+    if isinstance(item, type) and issubclass(item, base.Container):
+        def check(instance, value, errors, mode):
+            if isinstance(value, item):
+                return value
+            if not isinstance(value, collections.abc.Mapping):
+                errors.append(f"Attribute `{_ELEMENT}` should be an instance of `{item.__name__}`")
+                return INVALID
+            try:
+                return item.from_dict(value)
+            except ValidationError as exc:
+                messages = exc.errors if isinstance(exc.errors, list) else [str(exc)]
+                errors.extend(f"`{_ELEMENT}`: {message}" for message in messages)
+                return INVALID
+
+        def check_all(instance, values):
+            return all(issubclass(kind, item) for kind in set(map(type, values)))
+
+        return check, check_all
+
+    import copy
+
+    item = copy.copy(item)
+    item.field_name = _ELEMENT
+    return compile_validator(item), compile_batch(item)
+
+
+def _check_elements(instance, elements, errors, fail_fast, path):
+    """
+    Validate ``elements``, an iterable of ``(check, key, value)``.
+    Stops at first invalid element if either ``fail_fast`` or fail-fast validation mode is set.
+
+    :param path: format string to make path of invalid element out of its key, e.g ``"items[{!r}]"``
+    :returns: list of validated values and whether any of them was replaced
+    """
+    result = []
+    changed = False
+    mode = get_validation_mode(type(instance))
+    fail_fast = fail_fast or mode != COLLECT_ALL
+    failed = []
+    for check, key, value in elements:
+        ret = check(instance, value, failed, mode)
+        if failed:
+            element = path.format(key)
+            errors.extend(message.replace(_ELEMENT, element) for message in failed)
+            failed.clear()
+        if ret is INVALID and fail_fast:
+            break
+        changed = changed or ret is not value
+        result.append(ret)
+    return result, changed
+
+
+class ListOf(List):
+    """
+    Validate whether field is instance of type ``list`` and each of its items is valid against ``item``.
+
+    Homogeneous lists are checked as a whole first (e.g. single ``min`` call for ``Number``), items are validated
+    one by one only if that fails or ``item`` doesn't support it. Errors point to exact items, e.g ``items[1234]``.
+
+    :param item: validator instance or ``Container`` model to apply to each item
+    :param fail_fast: stop at first invalid item, defaults to ``False``
+    :type fail_fast: bool
+    """
+
+    cost = 5
+
+    def __setup__(self, item, fail_fast=False, types=(list,)):
+        List.__setup__(self, types)
+        self.item = item
+        self.fail_fast = fail_fast
+        self._check, self._check_all = _element_check(item)
+        if _changes_value(item):
+            self.computed = True
+
+    def validate(self, instance, value):
+        Type.validate(self, instance, value)
+        if self._check_all is not None and self._check_all(instance, value):
+            return
+        errors = []
+        check = self._check
+        result, changed = _check_elements(
+            instance,
+            ((check, index, element) for index, element in enumerate(value)),
+            errors,
+            self.fail_fast,
+            f"{self.field_name}[{{!r}}]"
+        )
+        if errors:
+            raise ValidationError(errors)
+        if changed:
+            return result
+
+
+class TupleOf(Tuple):
+    """
+    Validate whether field is instance of type ``tuple`` and its items are valid.
+    Use ``item`` for tuples of any length, or ``items`` for fixed length tuples, one validator per position.
+
+    :param item: validator instance or ``Container`` model to apply to each item
+    :param items: validators or ``Container`` models to apply to items at the same position
+    :type items: tuple
+
+    :param fail_fast: stop at first invalid item, defaults to ``False``
+    :type fail_fast: bool
+    """
+
+    cost = 5
+
+    def __setup__(self, item=UNSET, items=UNSET, fail_fast=False, types=(tuple,)):
+        item, items = _unset_none(item), _unset_none(items)
+        if (item is UNSET) == (items is UNSET):
+            raise ValueError("Exactly one of `item` and `items` should be specified")
+        Tuple.__setup__(self, types)
+        self.item = item
+        self.items = items
+        self.fail_fast = fail_fast
+        if items is UNSET:
+            self._check, self._check_all = _element_check(item)
+        else:
+            self._checks = tuple(_element_check(position)[0] for position in items)
+        if any(map(_changes_value, (item,) if items is UNSET else items)):
+            self.computed = True
+
+    def validate(self, instance, value):
+        Type.validate(self, instance, value)
+        name = self.field_name
+        if self.items is UNSET:
+            if self._check_all is not None and self._check_all(instance, value):
+                return
+            check = self._check
+            elements = ((check, index, element) for index, element in enumerate(value))
+        else:
+            if len(value) != len(self._checks):
+                raise ValidationError(f"Attribute `{name}` should have exactly {len(self._checks)} items")
+            elements = ((check, index, element) for index, (check, element) in enumerate(zip(self._checks, value)))
+        errors = []
+        result, changed = _check_elements(instance, elements, errors, self.fail_fast, f"{name}[{{!r}}]")
+        if errors:
+            raise ValidationError(errors)
+        if changed:
+            return tuple(result)
+
+
+class DictOf(Dict):
+    """
+    Validate whether field is instance of type ``dict`` and its keys and values are valid.
+
+    :param key: validator instance to apply to each key
+    :param value: validator instance or ``Container`` model to apply to each value
+
+    :param fail_fast: stop at first invalid key or value, defaults to ``False``
+    :type fail_fast: bool
+
+    :param required_keys: keys which should be present in a field
+    :type required_keys: iterable, optional
+    """
+
+    cost = 5
+
+    def __setup__(self, key=UNSET, value=UNSET, fail_fast=False, types=(dict,), required_keys=UNSET):
+        Dict.__setup__(self, types, required_keys)
+        key, value = _unset_none(key), _unset_none(value)
+        self.key = key
+        self.value = value
+        self.fail_fast = fail_fast
+        self._check_key, self._check_all_keys = (None, None) if key is UNSET else _element_check(key)
+        self._check_value, self._check_all_values = (None, None) if value is UNSET else _element_check(value)
+        if _changes_value(key) or _changes_value(value):
+            self.computed = True
+
+    def _is_valid(self, check, check_all, instance, values):
+        return check is None or (check_all is not None and check_all(instance, values))
+
+    def validate(self, instance, value):
+        Dict.validate(self, instance, value)
+        keys_valid = self._is_valid(self._check_key, self._check_all_keys, instance, value.keys())
+        values_valid = self._is_valid(self._check_value, self._check_all_values, instance, value.values())
+        if keys_valid and values_valid:
+            return
+        errors = []
+        name = self.field_name
+        fail_fast = self.fail_fast or get_validation_mode(type(instance)) != COLLECT_ALL
+        keys, keys_changed = list(value), False
+        if not keys_valid:
+            check = self._check_key
+            keys, keys_changed = _check_elements(
+                instance, ((check, key, key) for key in value), errors, self.fail_fast, f"{name}.keys()[{{!r}}]"
+            )
+        values, values_changed = list(value.values()), False
+        if not values_valid and not (errors and fail_fast):
+            check = self._check_value
+            values, values_changed = _check_elements(
+                instance, ((check, key, item) for key, item in value.items()), errors, self.fail_fast, f"{name}[{{!r}}]"
+            )
+        if errors:
+            raise ValidationError(errors)
+        if keys_changed or values_changed:
+            return dict(zip(keys, values))
+
+
 class Number(Type):
     """
     Validate whether field is an instance of type ``int`` and within specified range.
@@ -170,6 +425,19 @@ class Number(Type):
         elif self.max_value is not None and value > self.max_value:
             raise ValidationError(f"Attribute `{self.field_name}` should be <= {self.max_value}")
 
+    def validate_many(self, instance, values):
+        if not values or not Type.validate_many(self, instance, values):
+            return not values
+        if self.min_value is not None:
+            lowest = min(values)
+            if lowest != lowest or lowest < self.min_value:  # NaN at the head hides real minimum
+                return False
+        if self.max_value is not None:
+            highest = max(values)
+            if highest != highest or highest > self.max_value:
+                return False
+        return True
+
 
 class Predicate(BaseValidator):
     """
@@ -191,10 +459,14 @@ class Predicate(BaseValidator):
     :type default: callable, any, optional
     """
 
+    cost = 3
+
     def __setup__(self, predicate, default=UNSET, error_message=None):
         self.predicate = predicate
         self.default = default
         self.error_message = error_message
+        if default is not UNSET:
+            self.computed = True  # invalid values are replaced with ``default``
 
     def validate(self, instance, value):
         is_valid = self.predicate(instance, value)
@@ -211,6 +483,68 @@ class Predicate(BaseValidator):
             )
 
 
+@functools.lru_cache(maxsize=256)
+def _compile_pattern(pattern, flags):
+    import re
+    return re.compile(pattern, flags)
+
+
+class Pattern(BaseValidator):
+    """
+    Validate whether field matches regular expression.
+    Pattern is compiled once, compiled patterns are shared between all ``Pattern`` validators.
+
+    Combine it with ``String`` or ``Sized`` to check the type and length, e.g ``combine(String, Pattern, ...)``.
+
+    :param pattern: regular expression to match against, either string or compiled one
+    :type pattern: str, re.Pattern
+
+    :param flags: flags to compile ``pattern`` with, defaults to ``0``
+    :type flags: int, optional
+
+    :param mode: one of ``fullmatch``, ``match`` or ``search``, defaults to ``fullmatch``
+    :type mode: str, optional
+
+    :param error_message: message to raise with, supports ``{field_name}``, ``{pattern}`` and ``{value}``
+    :type error_message: str, optional
+    """
+
+    cost = 2
+    modes = ("fullmatch", "match", "search")
+
+    def __setup__(self, pattern, flags=0, mode="fullmatch", error_message=None):
+        if mode not in self.modes:
+            raise ValueError(f"`mode` should be one of {self.modes}, got {mode!r}")
+        if isinstance(pattern, (str, bytes)):
+            self.pattern = _compile_pattern(pattern, flags)
+        else:
+            import re
+
+            if not isinstance(pattern, re.Pattern):
+                raise TypeError(f"`pattern` should be either `str`, `bytes` or compiled pattern, got {pattern!r}")
+            self.pattern = pattern
+        self.mode = mode
+        self.error_message = error_message
+        self._match = getattr(self.pattern, mode)
+
+    def validate(self, instance, value):
+        try:
+            matched = self._match(value)
+        except TypeError:
+            matched = None
+        if matched is None:
+            error_message = self.error_message or "Attribute `{field_name}` should match `{pattern}`"
+            raise ValidationError(
+                error_message.format(field_name=self.field_name, pattern=self.pattern.pattern, value=value)
+            )
+
+    def validate_many(self, instance, values):
+        try:
+            return all(map(self._match, values))
+        except TypeError:
+            return False
+
+
 class LazyLoad(BaseValidator):
     """
     Calculate an attribute based on other fields.
@@ -218,6 +552,8 @@ class LazyLoad(BaseValidator):
     :param factory: callable to calculate value for current field, accepts current instance
     """
 
+    computed = True
+
     def __setup__(self, factory):
         self.factory = factory
 
@@ -227,17 +563,25 @@ class LazyLoad(BaseValidator):
         return self.factory(instance)
 
 
-for primitive in primitive_types:
+def __getattr__(name):
+    """
+    Create ``collections.abc`` based validators on first access, there's no need to pay for all of them on import.
+    """
     try:
-        globals()[primitive.__name__]
+        primitive = primitive_types[name]
     except KeyError:
-        globals().update({
-            primitive.__name__: type(
-                primitive.__name__,
-                (Type,),
-                {
-                    "__setup__": lambda self, types=(primitive,): Type.__setup__(self, types),
-                    "__doc__": f"Check whether field supports ``collections.abc.{primitive.__name__}`` interface."
-                }
-            )
-        })
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    validator = type(
+        name,
+        (Type,),
+        {
+            "__setup__": lambda self, types=(primitive,): Type.__setup__(self, types),
+            "__doc__": f"Check whether field supports ``collections.abc.{name}`` interface.",
+            "__module__": __name__
+        }
+    )
+    return globals().setdefault(name, validator)
+
+
+def __dir__():
+    return sorted({*globals(), *primitive_types})